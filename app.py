@@ -1,19 +1,34 @@
 import streamlit as st
-import json
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import orjson
 import os
 import random
+import hashlib
+import re
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-import base64
+import pybase64
 from PIL import Image
 import io
 import httpx
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 DATA_FILE = "wardrobe_data.json"
 IMAGES_DIR = "clothing_images"
 CONFIG_FILE = "user_config.json"
 
+# Longest side (px) of images sent to the vision API
+API_IMAGE_MAX_DIM = 1024
+
+# Size (px) of the thumbnails stored alongside each garment photo
+THUMBNAIL_SIZE = 800
+
+# Strips optional ``` / ```json fences (and surrounding whitespace) from API replies
+CODE_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$", re.DOTALL)
+
 # Ensure directories exist
 Path(IMAGES_DIR).mkdir(exist_ok=True)
 
@@ -22,34 +37,50 @@ Path(IMAGES_DIR).mkdir(exist_ok=True)
 # API Key Management
 # ====================
 
+@st.cache_data(show_spinner=False)
+def read_config_file(mtime):
+    """Parse the config file; mtime is only the cache key so edits on disk are picked up."""
+    return orjson.loads(Path(CONFIG_FILE).read_bytes())
+
+
 def load_config():
     """Load user configuration including API key."""
     if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
+        return read_config_file(os.path.getmtime(CONFIG_FILE))
     return {}
 
 
 def save_config(config):
     """Save user configuration."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    Path(CONFIG_FILE).write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+    read_config_file.clear()
+
+
+@st.cache_resource
+def get_openai_client():
+    """Shared HTTP/2 client so API calls reuse pooled keep-alive connections."""
+    return httpx.Client(
+        base_url="https://api.openai.com/v1",
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
 
 
 def validate_openai_key(api_key):
     """Validate OpenAI API key by making a simple request."""
     try:
-        response = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
+        response = get_openai_client().post(
+            "/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
+            content=orjson.dumps({
                 "model": "gpt-4o-mini",
                 "messages": [{"role": "user", "content": "Hi"}],
                 "max_tokens": 5
-            },
+            }),
             timeout=10.0
         )
         return response.status_code == 200
@@ -89,18 +120,30 @@ def fix_image_orientation(image_file):
     return img
 
 
-def image_to_base64(image_file):
-    """Convert uploaded image to base64 string, fixing orientation first."""
-    image_file.seek(0)  # Ensure we're at the start
-    img = fix_image_orientation(image_file)
+def flatten_to_rgb(img):
+    """Convert an image to RGB for JPEG, compositing any transparency onto white."""
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def image_to_base64(img, max_dim=API_IMAGE_MAX_DIM):
+    """Convert an orientation-corrected image to a downscaled JPEG base64 string."""
+    # GPT-4o downsizes internally, so don't pay to upload full-resolution photos.
+    # resize() returns a new image, leaving the caller's preview image untouched.
+    scale = max_dim / max(img.size)
+    if scale < 1:
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
     
     # Convert back to bytes
     buffer = io.BytesIO()
-    img_format = 'JPEG' if image_file.type == 'image/jpeg' else 'PNG'
-    img.save(buffer, format=img_format)
-    buffer.seek(0)
+    flatten_to_rgb(img).save(buffer, format="JPEG", quality=85, optimize=True)
     
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    # Encode straight from the buffer's memory rather than a getvalue() copy
+    return pybase64.b64encode(buffer.getbuffer()).decode('ascii')
 
 
 def analyze_garment_image(api_key, image_base64, image_type="image/jpeg"):
@@ -121,13 +164,13 @@ def analyze_garment_image(api_key, image_base64, image_type="image/jpeg"):
     Be accurate and practical with your categorization. Return ONLY the JSON, no other text."""
     
     try:
-        response = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
+        response = get_openai_client().post(
+            "/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
+            content=orjson.dumps({
                 "model": "gpt-4o",
                 "messages": [
                     {
@@ -144,21 +187,13 @@ def analyze_garment_image(api_key, image_base64, image_type="image/jpeg"):
                     }
                 ],
                 "max_tokens": 500
-            },
-            timeout=30.0
+            })
         )
         
         if response.status_code == 200:
-            content = response.json()["choices"][0]["message"]["content"]
+            content = orjson.loads(response.content)["choices"][0]["message"]["content"]
             # Clean up the response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
+            return orjson.loads(CODE_FENCE_RE.match(content).group(1))
         else:
             return None
     except Exception as e:
@@ -182,13 +217,13 @@ def analyze_tag_image(api_key, image_base64, image_type="image/jpeg"):
     Return ONLY the JSON, no other text. Use null for fields you cannot read."""
     
     try:
-        response = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
+        response = get_openai_client().post(
+            "/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
+            content=orjson.dumps({
                 "model": "gpt-4o",
                 "messages": [
                     {
@@ -205,27 +240,36 @@ def analyze_tag_image(api_key, image_base64, image_type="image/jpeg"):
                     }
                 ],
                 "max_tokens": 300
-            },
-            timeout=30.0
+            })
         )
         
         if response.status_code == 200:
-            content = response.json()["choices"][0]["message"]["content"]
+            content = orjson.loads(response.content)["choices"][0]["message"]["content"]
             # Clean up the response
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
+            return orjson.loads(CODE_FENCE_RE.match(content).group(1))
         else:
             return None
     except Exception as e:
         st.error(f"Error analyzing tag: {str(e)}")
         return None
 
+
+def hash_upload(uploaded_file):
+    """Content hash of an uploaded file, used to recognise repeat uploads."""
+    return hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+
+
+def run_concurrently(*calls):
+    """Run (func, *args) calls on worker threads and return their results in order."""
+    # Attach the script context so st.error() inside the calls still renders
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=len(calls),
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    ) as executor:
+        futures = [executor.submit(func, *args) for func, *args in calls]
+        return [future.result() for future in futures]
+
 # Category and tag options
 CATEGORIES = ["Top", "Bottom", "Shoes", "Outerwear", "Accessory", "Dress/Jumpsuit"]
 COLORS = ["Black", "White", "Gray", "Navy", "Blue", "Red", "Green", "Brown", "Beige", "Pink", "Purple", "Orange", "Yellow", "Multi"]
@@ -236,30 +280,31 @@ SEASONS = ["Spring", "Summer", "Fall", "Winter", "All Season"]
 # Order for displaying outfit items (top to bottom)
 CATEGORY_ORDER = ["Accessory", "Outerwear", "Top", "Dress/Jumpsuit", "Bottom", "Shoes"]
 
+# Option -> position lookups for selectbox defaults and sorting
+CATEGORY_IDX = {c: i for i, c in enumerate(CATEGORIES)}
+COLOR_IDX = {c: i for i, c in enumerate(COLORS)}
+CATEGORY_ORDER_IDX = {c: i for i, c in enumerate(CATEGORY_ORDER)}
+
 
 def load_wardrobe():
     """Load wardrobe data from JSON file."""
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
+        return orjson.loads(Path(DATA_FILE).read_bytes())
     return {"items": [], "outfits": []}
 
 
 def save_wardrobe(data):
     """Save wardrobe data to JSON file."""
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    # Write to a temp file and swap it in so a crash can't leave a half-written file
+    tmp_file = DATA_FILE + ".tmp"
+    Path(tmp_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, DATA_FILE)
 
 
-def save_image(uploaded_file, item_id):
-    """Save uploaded image with corrected orientation and return the file path."""
-    uploaded_file.seek(0)  # Ensure we're at the start
-    
-    # Fix orientation
-    img = fix_image_orientation(uploaded_file)
-    
+def save_image(img, original_name, item_id):
+    """Save an orientation-corrected image and return the file path."""
     # Determine format and extension
-    extension = uploaded_file.name.split(".")[-1].lower()
+    extension = original_name.split(".")[-1].lower()
     if extension not in ['jpg', 'jpeg', 'png', 'webp']:
         extension = 'jpg'
     
@@ -273,16 +318,58 @@ def save_image(uploaded_file, item_id):
     return filepath
 
 
+def save_thumbnail(img, item_id):
+    """Write a JPEG thumbnail of an orientation-corrected image and return its path."""
+    # thumbnail() works in place, so shrink a copy and leave the caller's image alone
+    img = img.copy()
+    img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+    
+    thumb_path = os.path.join(IMAGES_DIR, f"{item_id}_thumb.jpg")
+    flatten_to_rgb(img).save(thumb_path, format="JPEG", quality=80)
+    
+    return thumb_path
+
+
 def get_image_base64(filepath):
     """Convert image to base64 for display."""
     with open(filepath, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+        return pybase64.b64encode(f.read()).decode()
+
+
+@st.cache_data(max_entries=300, show_spinner=False)
+def load_thumbnail(filepath, mtime):
+    """Downscale and JPEG-encode an image once; mtime in the key invalidates replaced files."""
+    img = Image.open(filepath)
+    img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+    buffer = io.BytesIO()
+    flatten_to_rgb(img).save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+def get_thumbnail(item):
+    """Return an image st.image can display for an item, or None if it's missing."""
+    # Precomputed thumbnails are already small, so hand Streamlit the file as-is
+    thumb_path = item.get("thumb_path")
+    if thumb_path and os.path.exists(thumb_path):
+        return thumb_path
+    
+    # Older items only have the original; shrink it once and cache the encoded bytes.
+    # getmtime doubles as the existence check, saving a separate stat per item.
+    image_path = item.get("image_path")
+    if not image_path:
+        return None
+    try:
+        mtime = os.path.getmtime(image_path)
+    except FileNotFoundError:
+        return None
+    return load_thumbnail(image_path, mtime)
 
 
 def display_clothing_item(item, show_delete=False):
     """Display a clothing item card."""
-    if item.get("image_path") and os.path.exists(item["image_path"]):
-        st.image(item["image_path"], use_container_width=True)
+    thumbnail = get_thumbnail(item)
+    if thumbnail is not None:
+        st.image(thumbnail, use_container_width=True)
     else:
         st.markdown("📷 *No image*")
     st.caption(f"**{item['name']}**")
@@ -292,13 +379,21 @@ def display_clothing_item(item, show_delete=False):
     return False
 
 
+def group_by_category(items):
+    """Group items by category in a single pass over the list."""
+    by_category = {}
+    for item in items:
+        by_category.setdefault(item["category"], []).append(item)
+    return by_category
+
+
 def generate_random_outfit(wardrobe, include_categories):
     """Generate a random outfit based on selected categories."""
     outfit = {}
-    items = wardrobe["items"]
+    by_category = group_by_category(wardrobe["items"])
     
     for category in include_categories:
-        category_items = [item for item in items if item["category"] == category]
+        category_items = by_category.get(category)
         if category_items:
             outfit[category] = random.choice(category_items)
     
@@ -320,17 +415,18 @@ def generate_smart_outfit(wardrobe, occasion=None, season=None):
         items = wardrobe["items"]
     
     outfit = {}
+    by_category = group_by_category(items)
     
     # Check if there's a dress/jumpsuit (which replaces top+bottom)
-    dresses = [item for item in items if item["category"] == "Dress/Jumpsuit"]
+    dresses = by_category.get("Dress/Jumpsuit", [])
     
     if dresses and random.random() > 0.5:
         # Use a dress/jumpsuit
         outfit["Dress/Jumpsuit"] = random.choice(dresses)
     else:
         # Use top + bottom
-        tops = [item for item in items if item["category"] == "Top"]
-        bottoms = [item for item in items if item["category"] == "Bottom"]
+        tops = by_category.get("Top", [])
+        bottoms = by_category.get("Bottom", [])
         
         if tops:
             outfit["Top"] = random.choice(tops)
@@ -338,17 +434,17 @@ def generate_smart_outfit(wardrobe, occasion=None, season=None):
             outfit["Bottom"] = random.choice(bottoms)
     
     # Add shoes
-    shoes = [item for item in items if item["category"] == "Shoes"]
+    shoes = by_category.get("Shoes", [])
     if shoes:
         outfit["Shoes"] = random.choice(shoes)
     
     # Maybe add outerwear
-    outerwear = [item for item in items if item["category"] == "Outerwear"]
+    outerwear = by_category.get("Outerwear", [])
     if outerwear and random.random() > 0.6:
         outfit["Outerwear"] = random.choice(outerwear)
     
     # Maybe add accessory
-    accessories = [item for item in items if item["category"] == "Accessory"]
+    accessories = by_category.get("Accessory", [])
     if accessories and random.random() > 0.5:
         outfit["Accessory"] = random.choice(accessories)
     
@@ -407,8 +503,9 @@ wardrobe = st.session_state.wardrobe
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Wardrobe Stats**")
 st.sidebar.write(f"Total items: {len(wardrobe['items'])}")
+category_counts = Counter(i["category"] for i in wardrobe["items"])
 for cat in CATEGORIES:
-    count = len([i for i in wardrobe["items"] if i["category"] == cat])
+    count = category_counts[cat]
     if count > 0:
         st.sidebar.write(f"  {cat}: {count}")
 
@@ -491,7 +588,8 @@ elif page == "My Closet":
                     else:
                         st.info("📷 No image - upload one below")
 
-                    # Option to replace image
+                    # Option to replace image (decoded once below, reused on save)
+                    corrected_img = None
                     new_image = st.file_uploader(
                         "Replace image (optional)",
                         type=["jpg", "jpeg", "png", "webp"],
@@ -518,10 +616,10 @@ elif page == "My Closet":
                         
                         col1, col2 = st.columns(2)
                         with col1:
-                            category_idx = CATEGORIES.index(edit_item["category"]) if edit_item["category"] in CATEGORIES else 0
+                            category_idx = CATEGORY_IDX.get(edit_item["category"], 0)
                             category = st.selectbox("Category", CATEGORIES, index=category_idx)
                             
-                            color_idx = COLORS.index(edit_item["color"]) if edit_item["color"] in COLORS else 0
+                            color_idx = COLOR_IDX.get(edit_item["color"], 0)
                             color = st.selectbox("Primary color", COLORS, index=color_idx)
                         
                         with col2:
@@ -575,14 +673,15 @@ elif page == "My Closet":
                                         wardrobe["items"][i]["care_instructions"] = care.split("\n") if care else []
 
                                         # Replace image if new one uploaded (check session state)
-                                        if st.session_state.edit_uploaded_image:
-                                            st.session_state.edit_uploaded_image.seek(0)
+                                        if st.session_state.edit_uploaded_image and corrected_img is not None:
                                             # Delete old image
                                             if os.path.exists(item["image_path"]):
                                                 os.remove(item["image_path"])
                                             # Save new image
-                                            new_path = save_image(st.session_state.edit_uploaded_image, item["id"])
+                                            edit_upload = st.session_state.edit_uploaded_image
+                                            new_path = save_image(corrected_img, edit_upload.name, item["id"])
                                             wardrobe["items"][i]["image_path"] = new_path
+                                            wardrobe["items"][i]["thumb_path"] = save_thumbnail(corrected_img, item["id"])
 
                                         break
 
@@ -602,8 +701,9 @@ elif page == "My Closet":
             cols = st.columns(3)
             for idx, item in enumerate(filtered_items):
                 with cols[idx % 3]:
-                    if item.get("image_path") and os.path.exists(item["image_path"]):
-                        st.image(item["image_path"], use_container_width=True)
+                    thumbnail = get_thumbnail(item)
+                    if thumbnail is not None:
+                        st.image(thumbnail, use_container_width=True)
                     else:
                         # Show placeholder for items without images
                         st.markdown(
@@ -632,6 +732,9 @@ elif page == "My Closet":
                             # Delete tag image if exists
                             if item.get("tag_image_path") and os.path.exists(item["tag_image_path"]):
                                 os.remove(item["tag_image_path"])
+                            # Delete thumbnail if exists
+                            if item.get("thumb_path") and os.path.exists(item["thumb_path"]):
+                                os.remove(item["thumb_path"])
                             save_wardrobe(wardrobe)
                             st.session_state.wardrobe = wardrobe
                             st.rerun()
@@ -646,6 +749,8 @@ elif page == "Add Clothes":
         st.session_state.ai_analysis = None
     if "tag_analysis" not in st.session_state:
         st.session_state.tag_analysis = None
+    if "analysis_cache" not in st.session_state:
+        st.session_state.analysis_cache = {}
     
     # Step 1: Upload images
     st.subheader("📸 Step 1: Upload Photos")
@@ -664,7 +769,6 @@ elif page == "Add Clothes":
             garment_file.seek(0)
             corrected_garment = fix_image_orientation(garment_file)
             st.image(corrected_garment, caption="Garment", use_container_width=True)
-            garment_file.seek(0)  # Reset for later processing
     
     with col2:
         st.markdown("**Tag Photo** (optional)")
@@ -678,7 +782,6 @@ elif page == "Add Clothes":
             tag_file.seek(0)
             corrected_tag = fix_image_orientation(tag_file)
             st.image(corrected_tag, caption="Tag", use_container_width=True)
-            tag_file.seek(0)  # Reset for later processing
     
     # Step 2: Analyze with AI
     if garment_file:
@@ -686,19 +789,34 @@ elif page == "Add Clothes":
         
         if st.button("✨ Analyze with AI", use_container_width=True):
             api_key = config.get("api_key")
+            cache = st.session_state.analysis_cache
+            
+            # Key results on the upload's content so re-uploading the same photo is free
+            garment_key = ("garment", hash_upload(garment_file))
+            pending = []
+            if garment_key not in cache:
+                pending.append((garment_key, analyze_garment_image, corrected_garment))
+            if tag_file:
+                tag_key = ("tag", hash_upload(tag_file))
+                if tag_key not in cache:
+                    pending.append((tag_key, analyze_tag_image, corrected_tag))
             
-            with st.spinner("Analyzing garment..."):
-                # Analyze garment image
-                garment_base64 = image_to_base64(garment_file)
-                garment_type = garment_file.type or "image/jpeg"
-                st.session_state.ai_analysis = analyze_garment_image(api_key, garment_base64, garment_type)
+            if pending:
+                spinner_text = "Analyzing garment and reading tag..." if len(pending) > 1 else "Analyzing..."
+                with st.spinner(spinner_text):
+                    # Analyze garment and tag images concurrently
+                    results = run_concurrently(*[
+                        (analyze, api_key, image_to_base64(img), "image/jpeg")
+                        for _, analyze, img in pending
+                    ])
+                # Only remember successes so a failed call can be retried
+                for (key, _, _), result in zip(pending, results):
+                    if result:
+                        cache[key] = result
             
+            st.session_state.ai_analysis = cache.get(garment_key)
             if tag_file:
-                with st.spinner("Reading tag..."):
-                    # Analyze tag image
-                    tag_base64 = image_to_base64(tag_file)
-                    tag_type = tag_file.type or "image/jpeg"
-                    st.session_state.tag_analysis = analyze_tag_image(api_key, tag_base64, tag_type)
+                st.session_state.tag_analysis = cache.get(tag_key)
             
             if st.session_state.ai_analysis:
                 st.success("Analysis complete! Review and edit below.")
@@ -724,15 +842,11 @@ elif page == "Add Clothes":
             
             with col1:
                 # Get default index for category
-                category_default = 0
-                if ai.get("category") in CATEGORIES:
-                    category_default = CATEGORIES.index(ai.get("category"))
+                category_default = CATEGORY_IDX.get(ai.get("category"), 0)
                 category = st.selectbox("Category", CATEGORIES, index=category_default)
                 
                 # Get default index for color
-                color_default = 0
-                if ai.get("color") in COLORS:
-                    color_default = COLORS.index(ai.get("color"))
+                color_default = COLOR_IDX.get(ai.get("color"), 0)
                 color = st.selectbox("Primary color", COLORS, index=color_default)
             
             with col2:
@@ -773,12 +887,13 @@ elif page == "Add Clothes":
                     item_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}"
                     
                     # Save garment image
-                    image_path = save_image(garment_file, item_id)
+                    image_path = save_image(corrected_garment, garment_file.name, item_id)
+                    thumb_path = save_thumbnail(corrected_garment, item_id)
                     
                     # Save tag image if provided
                     tag_image_path = None
                     if tag_file:
-                        tag_image_path = save_image(tag_file, f"{item_id}_tag")
+                        tag_image_path = save_image(corrected_tag, tag_file.name, f"{item_id}_tag")
                     
                     # Create item
                     new_item = {
@@ -790,6 +905,7 @@ elif page == "Add Clothes":
                         "occasions": occasions,
                         "seasons": seasons,
                         "image_path": image_path,
+                        "thumb_path": thumb_path,
                         "tag_image_path": tag_image_path,
                         "brand": brand,
                         "size": size,
@@ -845,7 +961,7 @@ elif page == "Generate Outfit":
             # Sort outfit items by category order (top to bottom)
             sorted_outfit = sorted(
                 outfit.items(),
-                key=lambda x: CATEGORY_ORDER.index(x[0]) if x[0] in CATEGORY_ORDER else 99
+                key=lambda x: CATEGORY_ORDER_IDX.get(x[0], 99)
             )
             
             # Display outfit items
@@ -853,8 +969,9 @@ elif page == "Generate Outfit":
             for idx, (category, item) in enumerate(sorted_outfit):
                 with cols[idx]:
                     st.markdown(f"**{category}**")
-                    if item.get("image_path") and os.path.exists(item["image_path"]):
-                        st.image(item["image_path"], use_container_width=True)
+                    thumbnail = get_thumbnail(item)
+                    if thumbnail is not None:
+                        st.image(thumbnail, use_container_width=True)
                     else:
                         st.markdown("📷 *No image*")
                     st.caption(item["name"])
@@ -889,23 +1006,27 @@ elif page == "Saved Outfits":
     if not wardrobe["outfits"]:
         st.info("No saved outfits yet. Generate and save some outfits!")
     else:
+        # Look up items by ID instead of scanning the wardrobe for every outfit
+        items_by_id = {item["id"]: item for item in wardrobe["items"]}
+        
         for outfit_data in wardrobe["outfits"]:
             with st.expander(f"👔 {outfit_data['name']}", expanded=False):
-                # Get outfit items
-                outfit_items = [item for item in wardrobe["items"] if item["id"] in outfit_data["items"]]
+                # Get outfit items (skipping any that have since been deleted)
+                outfit_items = [items_by_id[item_id] for item_id in outfit_data["items"] if item_id in items_by_id]
                 
                 # Sort by category order
                 outfit_items = sorted(
                     outfit_items,
-                    key=lambda x: CATEGORY_ORDER.index(x["category"]) if x["category"] in CATEGORY_ORDER else 99
+                    key=lambda x: CATEGORY_ORDER_IDX.get(x["category"], 99)
                 )
                 
                 if outfit_items:
                     cols = st.columns(len(outfit_items))
                     for idx, item in enumerate(outfit_items):
                         with cols[idx]:
-                            if item.get("image_path") and os.path.exists(item["image_path"]):
-                                st.image(item["image_path"], use_container_width=True)
+                            thumbnail = get_thumbnail(item)
+                            if thumbnail is not None:
+                                st.image(thumbnail, use_container_width=True)
                             else:
                                 st.markdown("📷 *No image*")
                             st.caption(f"{item['category']}: {item['name']}")
@@ -959,7 +1080,7 @@ elif page == "Settings":
     with col2:
         # Export data
         if st.button("📤 Export Wardrobe Data"):
-            export_data = json.dumps(wardrobe, indent=2)
+            export_data = orjson.dumps(wardrobe, option=orjson.OPT_INDENT_2)
             st.download_button(
                 "Download JSON",
                 export_data,
@@ -978,7 +1099,7 @@ elif page == "Settings":
     if uploaded_json:
         try:
             # Read and parse JSON
-            imported_data = json.load(uploaded_json)
+            imported_data = orjson.loads(uploaded_json.getvalue())
 
             # Validate structure
             if not isinstance(imported_data, dict) or "items" not in imported_data:
@@ -1007,6 +1128,8 @@ elif page == "Settings":
                                 os.remove(item["image_path"])
                             if item.get("tag_image_path") and os.path.exists(item["tag_image_path"]):
                                 os.remove(item["tag_image_path"])
+                            if item.get("thumb_path") and os.path.exists(item["thumb_path"]):
+                                os.remove(item["thumb_path"])
                         wardrobe = {"items": [], "outfits": []}
 
                     # Import items (without images - user will need to re-upload)
@@ -1018,6 +1141,7 @@ elif page == "Settings":
 
                         # Mark image paths as missing
                         item["image_path"] = ""
+                        item["thumb_path"] = None
                         item["tag_image_path"] = None
 
                         wardrobe["items"].append(item)
@@ -1042,7 +1166,7 @@ elif page == "Settings":
                         st.warning("⚠️ Images were not imported. Go to 'My Closet' to edit items and upload images.")
                     st.rerun()
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             st.error("Invalid JSON file. Please upload a valid wardrobe export file.")
         except Exception as e:
             st.error(f"Error importing wardrobe: {str(e)}")
@@ -1067,8 +1191,9 @@ elif page == "Settings":
                     st.session_state.wardrobe = wardrobe
                     
                     # Clear images
-                    for f in Path(IMAGES_DIR).glob("*"):
-                        f.unlink()
+                    with os.scandir(IMAGES_DIR) as entries:
+                        for entry in entries:
+                            os.unlink(entry.path)
                     
                     st.session_state.confirm_delete = False
                     st.success("All data cleared.")